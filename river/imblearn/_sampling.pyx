@@ -0,0 +1,153 @@
+from libc.math cimport exp
+
+import numpy as np
+
+
+cpdef long poisson_draw(double rate, rng_random):
+    """Draw a Poisson-distributed count, via Knuth's multiplicative method.
+
+    The loop runs entirely in C; the only Python work left is the call to the
+    pre-bound RNG method, which keeps the draw sequence identical to
+    `utils.random.poisson`.
+    """
+    cdef double L = exp(-rate)
+    cdef long k = 0
+    cdef double p = 1.0
+    while p > L:
+        k += 1
+        p *= <double> rng_random()
+    return k - 1
+
+
+cdef class DistributionTracker:
+    """Tracks the desired and observed class distributions of a sampler.
+
+    Classes are remapped to dense integer ids on first sight. The desired and
+    observed distributions, as well as the cached likelihood ratios, are flat
+    arrays indexed by id, and the pivot (the class with the largest ratio) is
+    maintained incrementally. The per-sample arithmetic runs in C; the sampler
+    wrappers only consume the returned ratio or rate.
+    """
+
+    cdef readonly dict label2id
+    cdef object desired_dist
+    cdef object f, g, ratios
+    cdef Py_ssize_t n_classes
+    cdef Py_ssize_t pivot_id
+    cdef double pivot_ratio
+    cdef bint pivot_stale
+    cdef bint uniform
+    cdef double sampling_rate
+    cdef long long n
+
+    def __init__(self, desired_dist, double sampling_rate=1.0):
+        self.label2id = {}
+        self.desired_dist = desired_dist
+        self.f = np.zeros(0)
+        self.g = np.zeros(0)
+        self.ratios = np.zeros(0)
+        self.n_classes = 0
+        self.pivot_id = -1
+        self.pivot_ratio = 0.0
+        self.pivot_stale = False
+        self.uniform = desired_dist is None
+        self.sampling_rate = sampling_rate
+        self.n = 0
+
+    cdef Py_ssize_t _add_class(self, y):
+        cdef Py_ssize_t yid = self.n_classes
+        if yid == len(self.f):
+            capacity = max(2 * yid, 1)
+            self.f = np.resize(self.f, capacity)
+            self.g = np.resize(self.g, capacity)
+            self.ratios = np.resize(self.ratios, capacity)
+        self.f[yid] = self.desired_dist[y] if self.desired_dist is not None else 0.0
+        self.g[yid] = 0.0
+        self.ratios[yid] = 0.0
+        self.label2id[y] = yid
+        self.n_classes += 1
+        return yid
+
+    cdef Py_ssize_t _observe(self, y):
+        yid_obj = self.label2id.get(y)
+        if yid_obj is None:
+            return self._add_class(y)
+        return <Py_ssize_t> yid_obj
+
+    cdef void _rescan_pivot(self, double[::1] ratios):
+        # A linear scan keeping the first index in case of ties, which matches the
+        # first-seen tie-breaking since ids follow the order of appearance. A lazy
+        # max-heap would make this amortized O(log K), but it cannot reproduce the
+        # first-seen tie-breaking and a branch-predictable scan over a contiguous
+        # double buffer is faster for any realistic number of classes anyway.
+        cdef Py_ssize_t i, best = 0
+        for i in range(1, self.n_classes):
+            if ratios[i] > ratios[best]:
+                best = i
+        self.pivot_id = best
+        self.pivot_ratio = ratios[best]
+        self.pivot_stale = False
+
+    cpdef tuple under_observe(self, y):
+        """Account for one observation and return `(is_pivot, acceptance ratio)`."""
+        cdef Py_ssize_t yid = self._observe(y)
+        cdef double[::1] f = self.f
+        cdef double[::1] g = self.g
+        cdef double[::1] ratios = self.ratios
+        cdef double ratio_y
+
+        g[yid] += 1
+        ratio_y = f[yid] / g[yid]
+        ratios[yid] = ratio_y
+
+        if yid == self.pivot_id:
+            # The pivot's ratio just decreased, so it may have lost the argmax. The
+            # rescan is deferred until the next time a non-pivot class comes in.
+            self.pivot_stale = True
+            return True, 1.0
+
+        if self.pivot_stale or ratio_y == self.pivot_ratio:
+            self._rescan_pivot(ratios)
+        elif ratio_y > self.pivot_ratio:
+            self.pivot_id = yid
+            self.pivot_ratio = ratio_y
+
+        return False, f[yid] / (self.pivot_ratio * g[yid])
+
+    cpdef tuple over_observe(self, y):
+        """Account for one observation and return `(is_pivot, replication rate)`."""
+        cdef Py_ssize_t yid = self._observe(y)
+        cdef double[::1] f = self.f
+        cdef double[::1] g = self.g
+        cdef double[::1] ratios = self.ratios
+        cdef double ratio_y
+
+        g[yid] += 1
+        ratio_y = g[yid] / f[yid]
+        ratios[yid] = ratio_y
+
+        if yid == self.pivot_id:
+            # The pivot's ratio just increased, so it necessarily keeps the argmax
+            self.pivot_ratio = ratio_y
+            return True, 1.0
+
+        if ratio_y == self.pivot_ratio:
+            self._rescan_pivot(ratios)
+        elif ratio_y > self.pivot_ratio:
+            self.pivot_id = yid
+            self.pivot_ratio = ratio_y
+
+        return False, self.pivot_ratio * f[yid] / g[yid]
+
+    cpdef double plain_observe(self, y):
+        """Account for one observation and return its sampling rate."""
+        cdef Py_ssize_t yid = self._observe(y)
+        cdef double[::1] f = self.f
+        cdef double[::1] g = self.g
+        cdef double f_y
+
+        g[yid] += 1
+        self.n += 1
+
+        f_y = g[yid] if self.uniform else f[yid]
+        return self.sampling_rate * f_y / (g[yid] / self.n)
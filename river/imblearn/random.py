@@ -1,28 +1,109 @@
+"""Random sampling wrappers.
+
+The samplers defined here are thin Python wrappers around
+`imblearn._sampling.DistributionTracker`. The desired distribution is fixed at
+construction time, so each class' desired share is copied once into the tracker's flat
+buffers when the class is first seen; the per-sample hot path therefore performs no
+dictionary lookups on `desired_dist` and runs in C, the wrappers only deciding how to
+feed the wrapped classifier.
+"""
 from __future__ import annotations
 
-import collections
+import inspect
 import random
-import typing
 
-from river import base, utils
+import numpy as np
+import pandas as pd
+
+from river import base
+
+from ._sampling import DistributionTracker, poisson_draw
 
 
 class ClassificationSampler(base.Wrapper, base.Classifier):
-    def __init__(self, classifier, seed: int | None = None):
+    def __init__(self, classifier, seed: int | None = None, use_weights: bool = False):
         self.classifier = classifier
         self.seed = seed
+        self.use_weights = use_weights
         self._rng = random.Random(seed)
+        # Mini-batch draws go through a dedicated numpy generator so that whole blocks of
+        # Poisson samples can be obtained in one call, while the per-sample path keeps
+        # consuming `self._rng` and therefore remains reproducible across versions
+        self._np_rng = np.random.default_rng(seed)
+        # When the wrapped classifier natively supports sample weights, repeating k identical
+        # updates can be collapsed into a single weighted update. The parameter name is
+        # recorded so that the weight can be passed by keyword: the tree classifiers, for
+        # instance, declare it keyword-only.
+        self._weight_param = self._find_weight_param(classifier.learn_one)
+        self._supports_weights = self._weight_param is not None
+        learn_many = getattr(classifier, "learn_many", None)
+        self._batch_weight_param = (
+            None if learn_many is None else self._find_weight_param(learn_many)
+        )
+        self._supports_batch_weights = self._batch_weight_param is not None
+        if use_weights and not self._supports_weights:
+            raise ValueError(
+                "use_weights requires a classifier whose learn_one accepts a sample weight"
+            )
 
     @property
     def _wrapped_model(self):
         return self.classifier
 
+    @staticmethod
+    def _find_weight_param(method):
+        params = inspect.signature(method).parameters
+        for name in ("sample_weight", "w"):
+            if name in params:
+                return name
+        return None
+
+    def _learn_weighted_batch(self, X: pd.DataFrame, y: pd.Series, weights: np.ndarray, **kwargs):
+        """Feed a mini-batch to the classifier, honoring per-sample weights.
+
+        If the classifier's own `learn_many` accepts sample weights, the whole batch is
+        passed in a single call. Otherwise the surviving rows are fed one by one, weighted
+        when `learn_one` supports it and replicated when it does not.
+        """
+        mask = weights > 0
+        if not mask.any():
+            return
+        if self._supports_batch_weights:
+            w = pd.Series(weights[mask], index=X.index[mask])
+            self.classifier.learn_many(X[mask], y[mask], **{self._batch_weight_param: w}, **kwargs)
+            return
+        for x, y_, w in zip(X[mask].to_dict("records"), y[mask], weights[mask]):
+            if self._supports_weights:
+                self.classifier.learn_one(x, y_, **{self._weight_param: float(w)}, **kwargs)
+            else:
+                for _ in range(int(w)):
+                    self.classifier.learn_one(x, y_, **kwargs)
+
+    def _learn_replicated(self, x, y, k: int, **kwargs):
+        """Teach the classifier the sample `(x, y)` `k` times over.
+
+        Repeating an update on the same sample is equivalent to a single update with a
+        weight of `k` for models whose update rule is linear in the sample weight, so the
+        loop is collapsed whenever the classifier accepts one.
+        """
+        if self._supports_weights:
+            self.classifier.learn_one(x, y, **{self._weight_param: float(k)}, **kwargs)
+        else:
+            for _ in range(k):
+                self.classifier.learn_one(x, y, **kwargs)
+
     def predict_proba_one(self, x, **kwargs):
         return self.classifier.predict_proba_one(x, **kwargs)
 
     def predict_one(self, x, **kwargs):
         return self.classifier.predict_one(x, **kwargs)
 
+    def predict_proba_many(self, X, **kwargs):
+        return self.classifier.predict_proba_many(X, **kwargs)
+
+    def predict_many(self, X, **kwargs):
+        return self.classifier.predict_many(X, **kwargs)
+
 
 class RandomUnderSampler(ClassificationSampler):
     """Random under-sampling.
@@ -41,6 +122,10 @@ class RandomUnderSampler(ClassificationSampler):
         class percentages. The values must sum up to 1.
     seed
         Random seed for reproducibility.
+    use_weights
+        If `True`, rejection sampling is bypassed: every sample is fed to the classifier with
+        a weight equal to its acceptance probability. The classifier's `learn_one` method must
+        accept a sample weight.
 
     Examples
     --------
@@ -61,12 +146,12 @@ class RandomUnderSampler(ClassificationSampler):
     ...     seed=42
     ... )
 
-    >>> dataset = datasets.CreditCard().take(3000)
+    >>> dataset = datasets.Phishing()
 
     >>> metric = metrics.LogLoss()
 
     >>> evaluate.progressive_val_score(dataset, model, metric)
-    LogLoss: 0.0728
+    LogLoss: 0.357718
 
     References
     ----------
@@ -75,35 +160,40 @@ class RandomUnderSampler(ClassificationSampler):
 
     """
 
-    def __init__(self, classifier: base.Classifier, desired_dist: dict, seed: int | None = None):
-        super().__init__(classifier=classifier, seed=seed)
+    def __init__(
+        self,
+        classifier: base.Classifier,
+        desired_dist: dict,
+        seed: int | None = None,
+        use_weights: bool = False,
+    ):
+        super().__init__(classifier=classifier, seed=seed, use_weights=use_weights)
         self.desired_dist = desired_dist
-        self._actual_dist: typing.Counter = collections.Counter()
-        self._pivot = None
+        # The distribution bookkeeping and the pivot maintenance run in C
+        self._dist = DistributionTracker(desired_dist)
 
     def learn_one(self, x, y, **kwargs):
-        self._actual_dist[y] += 1
-        f = self.desired_dist
-        g = self._actual_dist
+        is_pivot, ratio = self._dist.under_observe(y)
 
-        # Check if the pivot needs to be changed
-        if y != self._pivot:
-            self._pivot = max(g.keys(), key=lambda y: f[y] / g[y])
-        else:
+        if is_pivot:
+            # Samples from the pivot class are always learned
             self.classifier.learn_one(x, y, **kwargs)
             return self
 
-        # Determine the sampling ratio if the class is not the pivot
-        M = f[self._pivot] / g[self._pivot]  # Likelihood ratio
-        ratio = f[y] / (M * g[y])
-
-        if ratio < 1 and self._rng.random() < ratio:
+        if self.use_weights:
+            # Enforce the desired distribution in expectation, without rejecting anything
+            self.classifier.learn_one(
+                x, y, **{self._weight_param: min(1.0, float(ratio))}, **kwargs
+            )
+        elif ratio >= 1 or self._rng.random() < ratio:
+            # A ratio of 1 means the class ties with the pivot and must always be accepted;
+            # the or short-circuits so no random draw is wasted in that case
             self.classifier.learn_one(x, y, **kwargs)
 
         return self
 
 
-class RandomOverSampler(ClassificationSampler):
+class RandomOverSampler(ClassificationSampler, base.MiniBatchClassifier):
     """Random over-sampling.
 
     This is a wrapper for classifiers. It will train the provided classifier by over-sampling the
@@ -121,6 +211,10 @@ class RandomOverSampler(ClassificationSampler):
         class percentages. The values must sum up to 1.
     seed
         Random seed for reproducibility.
+    use_weights
+        If `True`, the Poisson replication is bypassed: every sample is fed to the classifier
+        with a weight equal to its expected number of replications. The classifier's
+        `learn_one` method must accept a sample weight.
 
     Examples
     --------
@@ -150,34 +244,56 @@ class RandomOverSampler(ClassificationSampler):
 
     """
 
-    def __init__(self, classifier: base.Classifier, desired_dist: dict, seed: int | None = None):
-        super().__init__(classifier=classifier, seed=seed)
+    def __init__(
+        self,
+        classifier: base.Classifier,
+        desired_dist: dict,
+        seed: int | None = None,
+        use_weights: bool = False,
+    ):
+        super().__init__(classifier=classifier, seed=seed, use_weights=use_weights)
         self.desired_dist = desired_dist
-        self._actual_dist: typing.Counter = collections.Counter()
-        self._pivot = None
+        # The distribution bookkeeping and the pivot maintenance run in C
+        self._dist = DistributionTracker(desired_dist)
 
     def learn_one(self, x, y, **kwargs):
-        self._actual_dist[y] += 1
-        f = self.desired_dist
-        g = self._actual_dist
+        is_pivot, rate = self._dist.over_observe(y)
 
-        # Check if the pivot needs to be changed
-        if y != self._pivot:
-            self._pivot = max(g.keys(), key=lambda y: g[y] / f[y])
-        else:
+        if is_pivot:
+            # Samples from the pivot class are learned exactly once
             self.classifier.learn_one(x, y, **kwargs)
             return self
 
-        M = g[self._pivot] / f[self._pivot]
-        rate = M * f[y] / g[y]
+        if self.use_weights:
+            # Enforce the desired distribution in expectation, without replicating anything
+            self.classifier.learn_one(x, y, **{self._weight_param: float(rate)}, **kwargs)
+            return self
 
-        for _ in range(utils.random.poisson(rate, rng=self._rng)):
-            self.classifier.learn_one(x, y, **kwargs)
+        k = poisson_draw(rate, self._rng.random)
+        if k > 0:
+            self._learn_replicated(x, y, k, **kwargs)
 
         return self
 
+    def learn_many(self, X: pd.DataFrame, y: pd.Series, **kwargs):
+        # The distribution bookkeeping is inherently sequential but cheap; the expensive
+        # part, the replication counts, is drawn as a single block of Poisson samples
+        rates = np.empty(len(X))
+        deterministic = np.zeros(len(X), dtype=bool)
+        for i, label in enumerate(y):
+            # Samples from the pivot class are always learned exactly once
+            deterministic[i], rates[i] = self._dist.over_observe(label)
+
+        weights = rates
+        if not self.use_weights:
+            stochastic = ~deterministic
+            weights[stochastic] = self._np_rng.poisson(rates[stochastic])
+
+        self._learn_weighted_batch(X, y, weights, **kwargs)
+        return self
+
 
-class RandomSampler(ClassificationSampler):
+class RandomSampler(ClassificationSampler, base.MiniBatchClassifier):
     """Random sampling by mixing under-sampling and over-sampling.
 
     This is a wrapper for classifiers. It will train the provided classifier by both under-sampling
@@ -198,6 +314,10 @@ class RandomSampler(ClassificationSampler):
         The desired ratio of data to sample.
     seed
         Random seed for reproducibility.
+    use_weights
+        If `True`, the Poisson sampling is bypassed: every sample is fed to the classifier
+        with a weight equal to its expected number of replications. The classifier's
+        `learn_one` method must accept a sample weight.
 
     Examples
     --------
@@ -234,24 +354,37 @@ class RandomSampler(ClassificationSampler):
         desired_dist: dict,
         sampling_rate=1.0,
         seed: int | None = None,
+        use_weights: bool = False,
     ):
-        super().__init__(classifier=classifier, seed=seed)
+        super().__init__(classifier=classifier, seed=seed, use_weights=use_weights)
         self.sampling_rate = sampling_rate
-        self._actual_dist: typing.Counter = collections.Counter()
-        if desired_dist is None:
-            desired_dist = self._actual_dist
         self.desired_dist = desired_dist
-        self._n = 0
+        # The distribution bookkeeping runs in C. When no desired distribution is given,
+        # the observed counts take its place.
+        self._dist = DistributionTracker(desired_dist, sampling_rate)
 
     def learn_one(self, x, y, **kwargs):
-        self._actual_dist[y] += 1
-        self._n += 1
-        f = self.desired_dist
-        g = self._actual_dist
+        rate = self._dist.plain_observe(y)
 
-        rate = self.sampling_rate * f[y] / (g[y] / self._n)
+        if self.use_weights:
+            # Enforce the desired distribution in expectation, without replicating anything
+            self.classifier.learn_one(x, y, **{self._weight_param: float(rate)}, **kwargs)
+            return self
 
-        for _ in range(utils.random.poisson(rate, rng=self._rng)):
-            self.classifier.learn_one(x, y, **kwargs)
+        k = poisson_draw(rate, self._rng.random)
+        if k > 0:
+            self._learn_replicated(x, y, k, **kwargs)
+
+        return self
+
+    def learn_many(self, X: pd.DataFrame, y: pd.Series, **kwargs):
+        # The running class counts are updated sequentially, then the sampling counts are
+        # drawn as a single block of Poisson samples
+        rates = np.empty(len(X))
+        for i, label in enumerate(y):
+            rates[i] = self._dist.plain_observe(label)
+
+        weights = rates if self.use_weights else self._np_rng.poisson(rates).astype(float)
 
+        self._learn_weighted_batch(X, y, weights, **kwargs)
         return self
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import itertools
+import random
+
+import pandas as pd
+import pytest
+
+from river import datasets, imblearn, tree
+
+
+class WeightedRecorder:
+    """Classifier stub with native weight support, recording `(y, weight)` pairs."""
+
+    def __init__(self):
+        self.calls = []
+
+    def learn_one(self, x, y, *, sample_weight=1.0):
+        self.calls.append((y, float(sample_weight)))
+
+    def learn_many(self, X, y, *, sample_weight=1):
+        if not isinstance(sample_weight, pd.Series):
+            sample_weight = pd.Series(sample_weight, index=X.index, dtype=float)
+        self.calls.extend(zip(y, (float(w) for w in sample_weight)))
+
+
+class PlainRecorder:
+    """Classifier stub without weight support, recording each label it is fed."""
+
+    def __init__(self):
+        self.calls = []
+
+    def learn_one(self, x, y):
+        self.calls.append(y)
+
+
+def make_stream(seed, n=500):
+    rng = random.Random(seed)
+    return [
+        ({"a": rng.random()}, rng.choices([0, 1], weights=[9, 1])[0]) for _ in range(n)
+    ]
+
+
+def test_replicated_and_weighted_updates_match():
+    # With the same seed, a weight-aware classifier must receive a single update of weight
+    # k wherever a weightless classifier is fed k replicas.
+    desired_dist = {0: 0.5, 1: 0.5}
+    weighted = imblearn.RandomOverSampler(WeightedRecorder(), desired_dist, seed=42)
+    plain = imblearn.RandomOverSampler(PlainRecorder(), desired_dist, seed=42)
+
+    for x, y in make_stream(3):
+        weighted.learn_one(x, y)
+        plain.learn_one(x, y)
+
+    replayed = [y for y, w in weighted.classifier.calls for _ in range(int(w))]
+    assert replayed == plain.classifier.calls
+    # The under-represented class must actually have been replicated
+    assert any(w > 1 for _, w in weighted.classifier.calls)
+
+
+@pytest.mark.parametrize(
+    "sampler, params",
+    [
+        (imblearn.RandomOverSampler, {"desired_dist": {0: 0.5, 1: 0.5}}),
+        (imblearn.RandomSampler, {"desired_dist": {0: 0.5, 1: 0.5}, "sampling_rate": 0.7}),
+        (imblearn.RandomSampler, {"desired_dist": None, "sampling_rate": 0.7}),
+    ],
+)
+def test_minibatch_consistency(sampler, params):
+    # In use_weights mode there is no randomness left, so learn_many must hand the
+    # classifier the exact same weighted stream as sample-by-sample calls
+    one = sampler(WeightedRecorder(), use_weights=True, seed=42, **params)
+    many = sampler(WeightedRecorder(), use_weights=True, seed=42, **params)
+
+    data = make_stream(7, n=300)
+    X = pd.DataFrame([x for x, _ in data])
+    y = pd.Series([y for _, y in data])
+
+    for x, y_ in data:
+        one.learn_one(x, y_)
+    many.learn_many(X, y)
+
+    assert one.classifier.calls == many.classifier.calls
+
+
+def test_use_weights_requires_weight_support():
+    with pytest.raises(ValueError):
+        imblearn.RandomUnderSampler(
+            PlainRecorder(), desired_dist={0: 0.5, 1: 0.5}, use_weights=True
+        )
+
+
+@pytest.mark.parametrize(
+    "sampler", [imblearn.RandomUnderSampler, imblearn.RandomOverSampler]
+)
+def test_wrapped_tree_classifier(sampler):
+    # The Hoeffding trees declare their sample weight keyword-only, which exercises the
+    # weighted-update collapse through the keyword path
+    model = sampler(
+        tree.HoeffdingTreeClassifier(grace_period=10),
+        desired_dist={False: 0.3, True: 0.7},
+        seed=42,
+    )
+    for x, y in itertools.islice(datasets.Phishing(), 300):
+        model.learn_one(x, y)
+    assert model.predict_proba_one(x)
+
+    model = sampler(
+        tree.HoeffdingTreeClassifier(grace_period=10),
+        desired_dist={False: 0.3, True: 0.7},
+        seed=42,
+        use_weights=True,
+    )
+    for x, y in itertools.islice(datasets.Phishing(), 100):
+        model.learn_one(x, y)
+    assert model.predict_proba_one(x)
@@ -66,9 +66,20 @@ class Branch(base.Base, abc.ABC):
                 yield from node.walk(x, until_leaf)
 
     def traverse(self, x, until_leaf=True) -> Branch | Leaf:
-        """Return the leaf corresponding to the given input."""
-        for node in self.walk(x, until_leaf):
-            pass
+        """Return the leaf corresponding to the given input.
+
+        This is an iterative equivalent of exhausting `walk`, which spares the prediction
+        hot path from building a chain of generators per call.
+        """
+        node = self
+        while isinstance(node, Branch):
+            try:
+                node = node.next(x)
+            except KeyError:
+                if until_leaf:
+                    _, node = node.most_common_path()
+                else:
+                    break
         return node
 
     @property
@@ -1,15 +1,32 @@
 from __future__ import annotations
 
+import pickle
 from copy import deepcopy
 
+import numpy as np
+import pandas as pd
+
 from river import base, tree
 
-from .nodes.branch import DTBranch
+from .nodes.branch import DTBranch, NumericBinaryBranch
 from .nodes.isouptr_nodes import LeafAdaptiveMultiTarget, LeafMeanMultiTarget, LeafModelMultiTarget
 from .split_criterion import IntraClusterVarianceReductionSplitCriterion
 from .splitter import Splitter
 
 
+def _clone_leaf_models(leaf_models: dict) -> dict:
+    """Duplicate a parent's leaf models, preserving their learned state.
+
+    A pickle round-trip copies the models' parameter buffers in C and is considerably cheaper
+    than `deepcopy`, which traverses the whole object graph at the Python level. Models that
+    cannot be pickled fall back to `deepcopy`.
+    """
+    try:
+        return pickle.loads(pickle.dumps(leaf_models, protocol=pickle.HIGHEST_PROTOCOL))
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return deepcopy(leaf_models)
+
+
 class iSOUPTreeRegressor(tree.HoeffdingTreeRegressor, base.MultiTargetRegressor):
     """Incremental Structured Output Prediction Tree (iSOUP-Tree) for multi-target regression.
 
@@ -152,11 +169,26 @@ class iSOUPTreeRegressor(tree.HoeffdingTreeRegressor, base.MultiTargetRegressor)
 
         self.split_criterion: str = "icvr"  # intra cluster variance reduction
         self.targets: set = set()
+        # Dense integer ids assigned to the targets in order of appearance. The adaptive
+        # leaves index their faded error buffers with these.
+        self._target_ids: dict = {}
 
     @property
     def _mutable_attributes(self):
         return {"grace_period", "delta", "tau"}
 
+    @tree.HoeffdingTreeRegressor.leaf_prediction.setter  # type: ignore
+    def leaf_prediction(self, leaf_prediction):
+        tree.HoeffdingTreeRegressor.leaf_prediction.fset(self, leaf_prediction)
+        # Resolve the leaf constructor once, rather than chaining string comparisons every
+        # time a node is created
+        self._leaf_cls = {
+            self._TARGET_MEAN: LeafMeanMultiTarget,
+            self._MODEL: LeafModelMultiTarget,
+            self._ADAPTIVE: LeafAdaptiveMultiTarget,
+        }[self._leaf_prediction]
+        self._needs_leaf_models = self._leaf_prediction != self._TARGET_MEAN
+
     @tree.HoeffdingTreeRegressor.split_criterion.setter
     def split_criterion(self, split_criterion):
         if split_criterion == "vr":
@@ -179,33 +211,28 @@ class iSOUPTreeRegressor(tree.HoeffdingTreeRegressor, base.MultiTargetRegressor)
         """Create a new learning node. The type of learning node depends on
         the tree configuration.
         """
-        if parent is not None:
-            depth = parent.depth + 1
-        else:
-            depth = 0
+        depth = parent.depth + 1 if parent is not None else 0
+
+        if not self._needs_leaf_models:
+            return self._leaf_cls(initial_stats, depth, self.splitter)
 
-        leaf_models = None
-        if self.leaf_prediction in {self._MODEL, self._ADAPTIVE}:
-            if parent is None:
+        if parent is None:
+            leaf_models = {}
+        else:
+            try:
+                leaf_models = _clone_leaf_models(parent._leaf_models)  # noqa
+            except AttributeError:
+                # Due to an emerging category in a nominal feature, a split node was reached
                 leaf_models = {}
-            else:
-                try:
-                    leaf_models = deepcopy(parent._leaf_models)  # noqa
-                except AttributeError:
-                    # Due to an emerging category in a nominal feature, a split node was reached
-                    leaf_models = {}
-
-        if self.leaf_prediction == self._TARGET_MEAN:
-            return LeafMeanMultiTarget(initial_stats, depth, self.splitter)
-        elif self.leaf_prediction == self._MODEL:
-            return LeafModelMultiTarget(initial_stats, depth, self.splitter, leaf_models)
-        else:  # adaptive learning node
-            new_adaptive = LeafAdaptiveMultiTarget(initial_stats, depth, self.splitter, leaf_models)
-            if parent is not None and isinstance(parent, LeafAdaptiveMultiTarget):
-                new_adaptive._fmse_mean = parent._fmse_mean.copy()  # noqa
-                new_adaptive._fmse_model = parent._fmse_model.copy()  # noqa
-
-            return new_adaptive
+
+        new_leaf = self._leaf_cls(initial_stats, depth, self.splitter, leaf_models)
+        if isinstance(new_leaf, LeafAdaptiveMultiTarget) and isinstance(
+            parent, LeafAdaptiveMultiTarget
+        ):
+            new_leaf._fmse_mean = parent._fmse_mean.copy()  # noqa
+            new_leaf._fmse_model = parent._fmse_model.copy()  # noqa
+
+        return new_leaf
 
     def learn_one(self, x, y, *, sample_weight: float = 1.0) -> iSOUPTreeRegressor:  # type: ignore
         """Incrementally train the model with one sample.
@@ -228,20 +255,110 @@ class iSOUPTreeRegressor(tree.HoeffdingTreeRegressor, base.MultiTargetRegressor)
         sample_weight
             The weight of the passed sample.
         """
-        # Update target set
-        self.targets.update(y.keys())
+        # Update the target set. In steady streams the targets are almost always already
+        # known, so the set is only rebuilt when a new target actually shows up.
+        if not y.keys() <= self.targets:
+            self.targets.update(y.keys())
+            for t in y:
+                if t not in self._target_ids:
+                    self._target_ids[t] = len(self._target_ids)
 
         super().learn_one(x, y, sample_weight=sample_weight)  # type: ignore
 
         return self
 
     def predict_one(self, x):
-        pred = {}
+        root = self._root
+        if root is None:
+            # The tree has not been fed yet
+            return {}
+        leaf = root.traverse(x, until_leaf=True) if isinstance(root, DTBranch) else root
+        return leaf.prediction(x, tree=self)  # type: ignore
+
+    def learn_many(self, X: pd.DataFrame, Y: pd.DataFrame, *, sample_weight=1.0):
+        """Incrementally train the model with a mini-batch of samples.
+
+        Samples are replayed in order: training is sequential by nature, since a split may
+        restructure the tree in the middle of the batch.
+
+        Parameters
+        ----------
+        X
+            A dataframe of instance attributes.
+        Y
+            A dataframe of target values, one column per target.
+        sample_weight
+            The weight of the passed samples. Either a scalar applied to every sample or a
+            series aligned with `X`.
+
+        Returns
+        -------
+        self
+        """
+        if isinstance(sample_weight, pd.Series):
+            weights = sample_weight.tolist()
+        else:
+            weights = [sample_weight] * len(X)
+
+        for x, y, w in zip(X.to_dict("records"), Y.to_dict("records"), weights):
+            self.learn_one(x, y, sample_weight=w)
+
+        return self
+
+    def predict_many(self, X: pd.DataFrame) -> pd.DataFrame:
+        """Predict the target values of a mini-batch of samples.
+
+        Instead of traversing the tree once per sample, the whole mini-batch is partitioned
+        top-down: each numeric binary split is evaluated as a single vectorized comparison
+        over the rows that reached it. Rows reaching branch types without a vectorized test
+        fall back to the regular per-sample traversal.
+
+        Parameters
+        ----------
+        X
+            A dataframe of instance attributes.
+
+        Returns
+        -------
+        A dataframe of predictions, one column per target.
+        """
+        # Predictions are collected by row position rather than by index label, so that
+        # dataframes with duplicate index labels are handled correctly
+        preds: list = [{}] * len(X)
         if self._root is not None:
-            if isinstance(self._root, DTBranch):
-                leaf = self._root.traverse(x, until_leaf=True)
+            self._predict_slice(self._root, X, np.arange(len(X)), preds)
+        return pd.DataFrame(preds, index=X.index)
+
+    def _predict_slice(self, node, X: pd.DataFrame, rows: np.ndarray, preds: list):
+        """Route the rows of `X` through `node`, filling `preds` at the positions `rows`."""
+        if len(X) == 0:
+            return
+
+        if isinstance(node, NumericBinaryBranch):
+            if node.feature in X.columns:
+                # Same semantics as branch_no: NaN compares false and is sent right
+                mask = (X[node.feature] <= node.threshold).to_numpy()
+                self._predict_slice(node.children[0], X[mask], rows[mask], preds)
+                self._predict_slice(node.children[1], X[~mask], rows[~mask], preds)
             else:
-                leaf = self._root
-
-            pred = leaf.prediction(x, tree=self)  # type: ignore
-        return pred
+                # The split feature is absent, pass the whole slice to the most traversed path
+                _, child = node.most_common_path()
+                self._predict_slice(child, X, rows, preds)
+            return
+
+        if isinstance(node, DTBranch):
+            # No vectorized test for this branch type, sort the rows one by one
+            for i, x in zip(rows, X.to_dict("records")):
+                leaf = node.traverse(x, until_leaf=True)
+                preds[i] = leaf.prediction(x, tree=self)
+            return
+
+        if isinstance(node, LeafMeanMultiTarget) and not isinstance(node, LeafModelMultiTarget):
+            # The mean prediction does not depend on the instance, compute it once per slice
+            pred = node.prediction(None, tree=self)
+            for i in rows:
+                preds[i] = dict(pred)
+            return
+
+        for i, x in zip(rows, X.to_dict("records")):
+            preds[i] = node.prediction(x, tree=self)
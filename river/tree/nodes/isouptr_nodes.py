@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-import collections
 import functools
 import inspect
 from copy import deepcopy
 
+import numpy as np
+
 from river.stats import Var
 from river.utils import VectorDict
 
@@ -32,13 +33,24 @@ class LeafMeanMultiTarget(LeafMean):
     def __init__(self, stats, depth, splitter, **kwargs):
         stats = stats if stats else VectorDict(default_factory=functools.partial(Var))
         super().__init__(stats, depth, splitter, **kwargs)
+        # The mean prediction does not depend on the incoming instance, so it is cached and
+        # only recomputed after the target statistics or the monitored target set change
+        self._pred_cache: dict | None = None
+        self._pred_cache_n_targets = 0
 
     def update_stats(self, y, sample_weight):
         for t in y:
             self.stats[t].update(y[t], sample_weight)
+        self._pred_cache = None
 
     def prediction(self, x, *, tree=None):
-        return {t: self.stats[t].mean.get() if t in self.stats else 0.0 for t in tree.targets}
+        if self._pred_cache is None or self._pred_cache_n_targets != len(tree.targets):
+            self._pred_cache = {
+                t: self.stats[t].mean.get() if t in self.stats else 0.0 for t in tree.targets
+            }
+            self._pred_cache_n_targets = len(tree.targets)
+        # Hand out a copy so that callers cannot mutate the cached entry
+        return dict(self._pred_cache)
 
     @property
     def total_weight(self):
@@ -142,27 +154,50 @@ class LeafAdaptiveMultiTarget(LeafModelMultiTarget):
 
     def __init__(self, stats, depth, splitter, leaf_models, **kwargs):
         super().__init__(stats, depth, splitter, leaf_models, **kwargs)
-        self._fmse_mean = collections.defaultdict(float)
-        self._fmse_model = collections.defaultdict(float)
+        # The faded errors are flat buffers indexed by the tree's dense target ids, so that
+        # passing them down to the children at split time is a single memcpy each
+        self._fmse_mean = np.zeros(0)
+        self._fmse_model = np.zeros(0)
+
+    def _grow_fmse(self, n_targets):
+        buf = np.zeros(n_targets)
+        buf[: len(self._fmse_mean)] = self._fmse_mean
+        self._fmse_mean = buf
+        buf = np.zeros(n_targets)
+        buf[: len(self._fmse_model)] = self._fmse_model
+        self._fmse_model = buf
 
     def learn_one(self, x, y, *, sample_weight=1.0, tree=None):
-        pred_mean = {t: self.stats[t].mean.get() if t in self.stats else 0.0 for t in tree.targets}
-        pred_model = super().prediction(x, tree=tree)
-
-        for t in tree.targets:  # Update the faded errors
-            self._fmse_mean[t] = (
-                tree.model_selector_decay * self._fmse_mean[t] + (y[t] - pred_mean[t]) ** 2
-            )
-            self._fmse_model[t] = (
-                tree.model_selector_decay * self._fmse_model[t] + (y[t] - pred_model[t]) ** 2
-            )
+        target_ids = tree._target_ids
+        if len(self._fmse_mean) < len(target_ids):
+            self._grow_fmse(len(target_ids))
+
+        # Update the faded errors. The per-target predictions are consumed right away, so
+        # they are computed inline rather than materialized in temporary dicts on every call.
+        stats = self.stats
+        models = self._leaf_models
+        decay = tree.model_selector_decay
+        fmse_mean = self._fmse_mean
+        fmse_model = self._fmse_model
+        for t in tree.targets:
+            i = target_ids[t]
+            pred_mean = stats[t].mean.get() if t in stats else 0.0
+            pred_model = models[t].predict_one(x) if t in models else 0.0
+            fmse_mean[i] = decay * fmse_mean[i] + (y[t] - pred_mean) ** 2
+            fmse_model[i] = decay * fmse_model[i] + (y[t] - pred_model) ** 2
 
         super().learn_one(x, y, sample_weight=sample_weight, tree=tree)
 
     def prediction(self, x, *, tree=None):
         pred = {}
+        target_ids = tree._target_ids
+        n_known = len(self._fmse_mean)
         for t in tree.targets:
-            if self._fmse_mean[t] < self._fmse_model[t]:  # Act as a regression tree
+            i = target_ids[t]
+            # Targets this node has not seen yet have both errors at zero, hence act as a
+            # model tree for them, like the previous dict-of-floats representation did
+            if i < n_known and self._fmse_mean[i] < self._fmse_model[i]:
+                # Act as a regression tree
                 pred[t] = self.stats[t].mean.get() if t in self.stats else 0.0
             else:  # Act as a model tree
                 try:
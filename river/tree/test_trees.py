@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import random
 
+import pandas as pd
 import pytest
 
 from river import drift, tree
@@ -99,6 +100,50 @@ def test_memory_usage_multitarget():
     assert model._raw_memory_usage / (2**20) < 0.5
 
 
+def test_isoup_minibatch_consistency():
+    # learn_many/predict_many must match their one-sample counterparts
+    data = list(get_regression_data())
+    X = pd.DataFrame([x for x, _ in data])
+    Y = pd.DataFrame([{0: y, 1: 2 * y} for _, y in data])
+
+    one = tree.iSOUPTreeRegressor(leaf_prediction="adaptive", grace_period=100)
+    many = tree.iSOUPTreeRegressor(leaf_prediction="adaptive", grace_period=100)
+
+    for (x, _), y in zip(data, Y.to_dict("records")):
+        one.learn_one(x, y)
+    many.learn_many(X, Y)
+
+    preds_one = pd.DataFrame([one.predict_one(x) for x, _ in data], index=X.index)
+    preds_many = many.predict_many(X)
+
+    pd.testing.assert_frame_equal(preds_one, preds_many[preds_one.columns])
+
+    # Duplicate index labels must not collapse rows onto one prediction
+    X_dup = X.head(2).set_axis([0, 0])
+    preds_dup = many.predict_many(X_dup)
+    pd.testing.assert_frame_equal(
+        preds_dup[preds_one.columns], preds_many.head(2).set_axis([0, 0])[preds_one.columns]
+    )
+
+
+def test_isoup_adaptive_leaf_inherits_faded_errors():
+    # Children created at split time must receive independent copies of both the mean and
+    # the model faded errors of their parent, otherwise the leaves restart (or worse, share)
+    # their estimator-selection state.
+    model = tree.iSOUPTreeRegressor(leaf_prediction="adaptive", grace_period=1000)
+
+    for x, y in get_regression_data():
+        model.learn_one(x, {0: y, 1: 2 * y})
+
+    parent = model._root
+    child = model._new_leaf(parent=parent)
+
+    assert (child._fmse_mean == parent._fmse_mean).all()
+    assert (child._fmse_model == parent._fmse_model).all()
+    assert child._fmse_mean is not parent._fmse_mean
+    assert child._fmse_model is not parent._fmse_model
+
+
 def test_efdt_split_reevaluation():
     dataset = synth.SEA(seed=7, variant=2).take(500)
 